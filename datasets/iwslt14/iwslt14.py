@@ -1,10 +1,12 @@
 # coding=utf-8
 """The IWSLT 2014 Evaluation Campaign includes a multilingual TED Talks MT task."""
 
+import itertools
+
 import datasets
+import pyarrow as pa
 
-from bs4 import BeautifulSoup
-from pathlib import Path
+from lxml import etree
 
 _CITATION = """\
 @inproceedings{cettoloEtAl:EAMT2012,
@@ -40,6 +42,109 @@ _HOMEPAGE = "https://wit3.fbk.eu/2014-01"
 
 _LANGUAGES = ["ar", "de", "es", "fa", "he", "it", "nl", "pl", "pt-br", "ro", "ru", "sl", "tr", "zh"]
 _PAIRS = [(lang, "en") for lang in _LANGUAGES] + [("en", lang) for lang in _LANGUAGES]
+_PAIRS_SET = frozenset(_PAIRS)
+
+# shared by all the language pair configs
+_VERSION = datasets.Version("1.0.0", "")
+
+# number of examples per yielded Arrow table
+_BATCH_SIZE = 10_000
+
+
+def _get_drive_url(url):
+    return f"https://drive.google.com/uc?id={url.split('/')[5]}"
+
+
+def _parse_doc(file_path: str):
+    # segments are the untagged lines following a talk's <url> line
+    docid = 0
+    segid = 0
+    # only the segment lines are decoded, the tag lines are checked on the raw bytes
+    with open(file_path, "rb") as f:
+        for line in f:
+            if line.startswith(b'<url'):
+                docid += 1
+                segid = 0
+            elif line.startswith(b'<'):
+                # metadata lines (<keywords>, <speaker>, <talkid>, <title>, ...) sit between a talk's
+                # <url> and its transcript: skip them without ending the talk
+                continue
+            elif docid > 0:
+                segid += 1
+                yield docid, segid, line.decode("utf-8").strip()
+
+
+def _parse_xml(file_path: str):
+    # stream the document: only the talk being processed is kept in memory
+    docid = None
+    # the raw bytes are decoded by lxml itself, according to the XML declaration
+    with open(file_path, "rb") as f:
+        context = etree.iterparse(
+            f, events=("start", "end"), tag=("doc", "title", "description", "seg"), recover=True
+        )
+        for event, elem in context:
+            if event == "start":
+                if elem.tag == "doc":
+                    docid = elem.get('docid')
+                    titles, descs, segs = [], [], []
+                continue
+            if elem.tag == "doc":
+                # the files list <description> before <title>: keep yielding a talk's
+                # title, then its description, then its segments
+                yield from titles
+                yield from descs
+                yield from segs
+                docid = None
+            elif docid is not None:
+                text = ''.join(elem.itertext()).strip()
+                if elem.tag == "title":
+                    titles.append((docid, "title", text))
+                elif elem.tag == "description":
+                    descs.append((docid, "desc", text))
+                else:
+                    segs.append((docid, elem.get('id'), text))
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
+def _parse(file_path: str):
+    if file_path.endswith('.xml'):
+        return _parse_xml(file_path)
+    else:
+        return _parse_doc(file_path)
+
+
+def _segment_id(docid, segid):
+    if segid in ("title", "desc"):
+        return f'docid-{docid}_{segid}'
+    return f'docid-{docid}_segid-{segid}'
+
+
+def _align(source_segments, target_segments):
+    """Yields (docid, segid, source text, target text) for the segments found in both files."""
+    source_segments = iter(source_segments)
+    target_segments = iter(target_segments)
+    for (src_docid, src_segid, src_sent), (trg_docid, trg_segid, trg_sent) in zip(source_segments, target_segments):
+        if src_docid != trg_docid or src_segid != trg_segid:
+            # the files are not aligned from here on: join the remaining segments on their ids
+            trg = {(trg_docid, trg_segid): trg_sent}
+            trg.update(((docid, segid), sent) for docid, segid, sent in target_segments)
+            remaining = itertools.chain([(src_docid, src_segid, src_sent)], source_segments)
+            for docid, segid, src_sent in remaining:
+                if (docid, segid) in trg:
+                    yield docid, segid, src_sent, trg[docid, segid]
+            return
+        yield src_docid, src_segid, src_sent, trg_sent
+
+
+def _translation_table(ids, sents, schema):
+    """Builds a table of examples from their ids and their texts in each language."""
+    languages = sorted(sents)
+    translations = pa.StructArray.from_arrays(
+        [pa.array(sents[lang], type=pa.string()) for lang in languages], names=languages
+    )
+    return pa.Table.from_arrays([pa.array(ids, type=pa.string()), translations], schema=schema)
 
 
 class IWSLT14Config(datasets.BuilderConfig):
@@ -56,17 +161,17 @@ class IWSLT14Config(datasets.BuilderConfig):
         super(IWSLT14Config, self).__init__(
             name="%s-%s" % (language_pair[0], language_pair[1]),
             description="IWSLT 2014 multilingual dataset.",
-            version=datasets.Version("1.0.0", ""),
+            version=_VERSION,
             **kwargs,
         )
 
         # Validate language pair.
-        assert language_pair in _PAIRS
+        assert language_pair in _PAIRS_SET
 
         self.language_pair = language_pair
 
 
-class IWSLT14(datasets.GeneratorBasedBuilder):
+class IWSLT14(datasets.ArrowBasedBuilder):
     """The IWSLT 2014 Evaluation Campaign includes a multilingual TED Talks MT task."""
 
     BUILDER_CONFIGS = [IWSLT14Config(language_pair=pair) for pair in _PAIRS]
@@ -93,10 +198,6 @@ class IWSLT14(datasets.GeneratorBasedBuilder):
 
     def _split_generators(self, dl_manager):
         """Returns SplitGenerators."""
-
-        def _get_drive_url(url):
-            return f"https://drive.google.com/uc?id={url.split('/')[5]}"
-
         source, target = self.config.language_pair
         pair = f"{source}-{target}"
         ex_dir = dl_manager.download_and_extract(_get_drive_url(_URL))
@@ -130,63 +231,20 @@ class IWSLT14(datasets.GeneratorBasedBuilder):
             datasets.SplitGenerator(name=datasets.Split.TEST, gen_kwargs=files["test"]),
         ]
 
-    def _generate_examples(self, source_files, target_files, split):
-        """Yields examples."""
+    def _generate_tables(self, source_files, target_files, split):
+        """Yields tables of up to _BATCH_SIZE examples."""
         source, target = self.config.language_pair
-
-        def _parse_doc(file_path: str):
-            html_doc = Path(file_path).read_text()
-            html_doc = ''.join([f'<seg>{line}</seg>' if not line.startswith('<') else line
-                                for line in html_doc.splitlines()])
-            soup = BeautifulSoup(html_doc, features="lxml")
-            docs = {}
-            docid = 0
-            for url in soup.find_all('url'):
-                docid += 1
-                s = url
-                segid = 0
-                while s.next_sibling and s.next_sibling.name == 'seg':
-                    segid += 1
-                    docs[f'docid-{docid}_segid-{segid}'] = s.next_sibling.text.strip()
-                    s = s.next_sibling
-            return docs
-
-        def _parse_xml(file_path: str):
-            html_doc = Path(file_path).read_text()
-            soup = BeautifulSoup(html_doc, features="lxml")
-            docs = {}
-            for doc in soup.find_all('doc'):
-                docid = doc.attrs['docid']
-                for title in doc.find_all('title'):
-                    docs[f'docid-{docid}_title'] = title.text.strip()
-                for desc in doc.find_all('description'):
-                    docs[f'docid-{docid}_desc'] = desc.text.strip()
-                for seg in doc.find_all('seg'):
-                    segid = seg.attrs['id']
-                    docs[f'docid-{docid}_segid-{segid}'] = seg.text.strip()
-            return docs
-
-        def _parse(file_path: str):
-            if file_path.endswith('.xml'):
-                return _parse_xml(file_path)
-            else:
-                return _parse_doc(file_path)
-
-        id_ = 0
-        seg_counter = 0
-        doc_counter = 10000
-        talk_id = f"d{doc_counter}"
-        flag = ""
+        schema = self.info.features.arrow_schema
+        batch_idx = 0
+        ids, sents = [], {source: [], target: []}
         for source_file, target_file in zip(source_files, target_files):
-            src = _parse(source_file)
-            trg = _parse(target_file)
-
-            for k, src_sent in src.items():
-                if k in trg:
-                    trg_sent = trg[k]
-
-                    yield id_, {
-                        "id": k,
-                        "translation": {source: src_sent, target: trg_sent}
-                    }
-                    id_ += 1
+            for docid, segid, src_sent, trg_sent in _align(_parse(source_file), _parse(target_file)):
+                ids.append(_segment_id(docid, segid))
+                sents[source].append(src_sent)
+                sents[target].append(trg_sent)
+                if len(ids) == _BATCH_SIZE:
+                    yield batch_idx, _translation_table(ids, sents, schema)
+                    batch_idx += 1
+                    ids, sents = [], {source: [], target: []}
+        if ids:
+            yield batch_idx, _translation_table(ids, sents, schema)
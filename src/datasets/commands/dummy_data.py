@@ -191,6 +191,8 @@ class DummyDataGeneratorDownloadManager(DownloadManager):
         with open(src_path, encoding=encoding) as src_file:
             n_line = 0
             parents = []
+            # the whole file is parsed so that any content after the samples is kept,
+            # but the samples past the first n_lines are dropped as soon as they end
             for event, elem in ET.iterparse(src_file, events=("start", "end")):
                 if event == "start":
                     parents.append(elem)
@@ -209,7 +211,11 @@ class DummyDataGeneratorDownloadManager(DownloadManager):
         base_name = os.path.join(root_dir, "dummy_data")
         base_dir = "dummy_data"
         logger.info(f"Compressing dummy data folder to '{base_name}.zip'")
-        shutil.make_archive(base_name, "zip", root_dir, base_dir)
+        # write the archive next to its destination and move it in place once complete,
+        # so that an existing dummy_data.zip is never left half-written
+        with tempfile.TemporaryDirectory(dir=root_dir) as tmp_dir:
+            archive_path = shutil.make_archive(os.path.join(tmp_dir, base_dir), "zip", root_dir, base_dir)
+            os.replace(archive_path, base_name + ".zip")
         shutil.rmtree(base_name)
 
 
@@ -0,0 +1,56 @@
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+from datasets.commands.dummy_data import DummyDataGeneratorDownloadManager
+
+
+@pytest.mark.parametrize("n_lines", [0, 1, 5])
+def test_create_xml_dummy_data(n_lines, tmp_path):
+    # enough samples for the file to span several iterparse chunks
+    tus = "".join(f'<tu><tuv xml:lang="en"><seg>Sentence {i}</seg></tuv></tu>' for i in range(10_000))
+    src_path = tmp_path / "data.tmx"
+    src_path.write_text(f'<?xml version="1.0"?><tmx><header/><body>{tus}</body><footer/></tmx>', encoding="utf-8")
+    dst_path = tmp_path / "dummy_data" / "data.tmx"
+    DummyDataGeneratorDownloadManager._create_xml_dummy_data(str(src_path), str(dst_path), "tu", n_lines=n_lines)
+    root = ET.parse(dst_path).getroot()
+    assert root.find("header") is not None
+    assert root.find("footer") is not None
+    assert [seg.text for seg in root.iter("seg")] == [f"Sentence {i}" for i in range(n_lines)]
+
+
+def test_compress_autogenerated_dummy_data(tmp_path):
+    mock_dl_manager = SimpleNamespace(dummy_data_folder=os.path.join("dummy", "1.0.0"))
+    dl_manager = DummyDataGeneratorDownloadManager(mock_download_manager=mock_dl_manager)
+    root_dir = tmp_path / "dummy" / "1.0.0"
+    (root_dir / "dummy_data").mkdir(parents=True)
+    (root_dir / "dummy_data" / "train.txt").write_text("foo\nbar\n")
+    dl_manager.compress_autogenerated_dummy_data(str(tmp_path))
+    assert sorted(os.listdir(root_dir)) == ["dummy_data.zip"]
+    with zipfile.ZipFile(root_dir / "dummy_data.zip") as zip_file:
+        assert zip_file.read("dummy_data/train.txt") == b"foo\nbar\n"
+
+
+def test_compress_autogenerated_dummy_data_keeps_existing_archive_on_failure(tmp_path, monkeypatch):
+    mock_dl_manager = SimpleNamespace(dummy_data_folder=os.path.join("dummy", "1.0.0"))
+    dl_manager = DummyDataGeneratorDownloadManager(mock_download_manager=mock_dl_manager)
+    root_dir = tmp_path / "dummy" / "1.0.0"
+    (root_dir / "dummy_data").mkdir(parents=True)
+    (root_dir / "dummy_data" / "train.txt").write_text("foo\nbar\n")
+    with zipfile.ZipFile(root_dir / "dummy_data.zip", "w") as zip_file:
+        zip_file.writestr("dummy_data/train.txt", "sentinel")
+    sentinel = (root_dir / "dummy_data.zip").read_bytes()
+
+    def make_archive_failing(base_name, *args, **kwargs):
+        with open(base_name + ".zip", "wb") as f:
+            f.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr("shutil.make_archive", make_archive_failing)
+    with pytest.raises(OSError):
+        dl_manager.compress_autogenerated_dummy_data(str(tmp_path))
+    assert (root_dir / "dummy_data.zip").read_bytes() == sentinel
+    assert not [name for name in os.listdir(root_dir) if name.startswith("tmp")]